@@ -17,6 +17,7 @@ class Client(Host):
         except Exception as e:
             print(f"Failed to connect to server at {IP}:{port}: {e}")
             return
+        self.configure_socket(self.tcp_socket)
         print(f"Connected to server at {IP}:{port}")
 
         self.shutdown_event = threading.Event()     # Evento para sinalizar encerramento
@@ -172,6 +173,8 @@ class Client(Host):
                 print("ERROR: Header too large to be processed.")
             elif status == Status.BAD_REQUEST:
                 print("ERROR: Bad request sent to server.")
+            elif status == Status.SERVER_BUSY:
+                print("ERROR: Server is busy (too many clients). Try again later.")
             else:
                 print("ERROR: Unknown response from server.")
         
@@ -188,7 +191,8 @@ class Client(Host):
         except Exception:
             pass
 
-    def parse_response(self, data):
+    @staticmethod
+    def parse_response(data):
         """
         Parseia a resposta do servidor.
         Formato esperado da mensagem de chat: "CHAT <msg_len>(2) <msg>"
@@ -4,13 +4,34 @@ Superclasse para Cliente e Servidor.
 """
 
 import socket
-from macros import MAX_BUFF_SIZE
+import time
+from macros import MAX_BUFF_SIZE, SEND_TIMEOUT, TCP_KEEPALIVE, TCP_KEEPIDLE, TCP_KEEPINTVL, TCP_KEEPCNT, TCP_NODELAY
 
 class Host():
     def __init__(self):
         self.tcp_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)     # Cria socket TCP
         self.tcp_socket.settimeout(1.0)     # Timeout (para verificar encerramento do programa)
 
+    def configure_socket(self, sock, keepalive=TCP_KEEPALIVE, nodelay=TCP_NODELAY):
+        """
+        Aplica as opções de TCP (keepalive e nodelay) ao socket de conexão dado.
+        Os tempos do keepalive são ajustados onde a plataforma permite (senão valem os padrões do SO).
+        """
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1 if keepalive else 0)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1 if nodelay else 0)
+        except OSError:
+            pass
+
+        if not keepalive:
+            return
+        for option, value in (("TCP_KEEPIDLE", TCP_KEEPIDLE), ("TCP_KEEPINTVL", TCP_KEEPINTVL), ("TCP_KEEPCNT", TCP_KEEPCNT)):
+            if hasattr(socket, option):
+                try:
+                    sock.setsockopt(socket.IPPROTO_TCP, getattr(socket, option), value)
+                except OSError:
+                    pass
+
     def close_socket(self, sock, addr):
         """
         Fecha o socket dado.
@@ -26,9 +47,11 @@ class Host():
         except OSError:
             pass
 
-    def send_message(self, sock, message):
+    def send_message(self, sock, message, send_timeout=SEND_TIMEOUT):
         """
         Envia a mensagem pelo socket dado.
+        O timeout curto do socket é usado apenas para o polling do recv: o envio continua enquanto
+        houver progresso, e falha (ConnectionError) após send_timeout segundos sem enviar nenhum byte.
         """
         try:
             if isinstance(message, int):
@@ -38,13 +61,23 @@ class Host():
         except Exception:
             return
 
-        try:
-            sock.sendall(message)
-        except (ConnectionResetError, BrokenPipeError):
-            raise ConnectionError
-        except OSError as e:
-            if e.winerror == 10038:  # Socket já fechado
-                return
+        view = memoryview(message)
+        deadline = time.monotonic() + send_timeout
+        while view:
+            try:
+                sent = sock.send(view)
+            except socket.timeout:
+                if time.monotonic() > deadline:     # Peer não está consumindo os dados
+                    raise ConnectionError
+                continue
+            except (ConnectionResetError, BrokenPipeError):
+                raise ConnectionError
+            except OSError as e:
+                if getattr(e, "winerror", None) == 10038:  # Socket já fechado
+                    return
+                raise ConnectionError
+            view = view[sent:]
+            deadline = time.monotonic() + send_timeout
     
     def receive_message(self, sock, buffer_size=MAX_BUFF_SIZE):
         """
@@ -60,6 +93,6 @@ class Host():
         except socket.timeout:
             return "TIMEOUT"
         except OSError as e:
-            if e.winerror == 10038:  # Socket já fechado
+            if getattr(e, "winerror", None) == 10038:  # Socket já fechado
                 return None
             
\ No newline at end of file
@@ -14,8 +14,27 @@ class Status:
     NOT_FOUND = 2
     HEADER_TOO_LARGE = 3
     FILE_TOO_LARGE = 4
+    SERVER_BUSY = 5
 
 MAX_BUFF_SIZE = 4096
 DIR_SERVER = "server_files/"
 DIR_CLIENT = "client_files/"
-HASH_ALGORITHM = 'sha256'
\ No newline at end of file
+HASH_ALGORITHM = 'sha256'
+
+# Controle de admissão e conexões no servidor
+MAX_CLIENTS = 64        # Máximo de clientes conectados simultaneamente
+LISTEN_BACKLOG = 16     # Tamanho da fila de conexões pendentes do listen()
+IDLE_TIMEOUT = 300.0    # Segundos sem mensagens do cliente antes de fechar a conexão (None desativa)
+TCP_KEEPALIVE = True    # Habilita SO_KEEPALIVE nos sockets de conexão
+TCP_KEEPIDLE = 60       # Segundos de inatividade antes da primeira sonda de keepalive
+TCP_KEEPINTVL = 10      # Segundos entre sondas de keepalive
+TCP_KEEPCNT = 5         # Sondas sem resposta antes de considerar a conexão perdida
+TCP_NODELAY = True      # Desabilita o algoritmo de Nagle (menor latência no chat)
+SEND_TIMEOUT = 30.0     # Segundos sem progresso no envio antes de considerar a conexão perdida
+
+# Pool de conexões do cliente
+POOL_SIZE = 4               # Máximo de conexões mantidas pelo pool
+POOL_MAX_RETRIES = 3        # Tentativas extras de um request após falha de transporte
+POOL_BACKOFF = 0.1          # Espera inicial (s) entre tentativas, dobrada a cada falha
+POOL_MAX_BACKOFF = 2.0      # Espera máxima (s) entre tentativas
+RESPONSE_TIMEOUT = 10.0     # Tempo máximo (s) sem dados ao aguardar uma resposta
\ No newline at end of file
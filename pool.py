@@ -0,0 +1,302 @@
+"""
+Módulo de pool de conexões do cliente.
+Mantém conexões persistentes com o servidor, emprestando-as a chamadas concorrentes,
+e reconecta automaticamente (com backoff) quando um request falha por erro de transporte.
+"""
+
+import select
+import threading
+import time
+from host import Host
+from client import Client
+from macros import Commands, Status, POOL_SIZE, POOL_MAX_RETRIES, POOL_BACKOFF, POOL_MAX_BACKOFF, RESPONSE_TIMEOUT
+from hash import verify_hash
+
+class PooledConnection(Host):
+    def __init__(self, IP, port):
+        super().__init__()
+        try:
+            self.tcp_socket.connect((IP, port))     # Conecta ao servidor dado (respeitando o timeout do socket)
+        except Exception:
+            self.close()    # Não deixa o socket aberto a cada tentativa de reconexão que falha
+            raise
+        self.configure_socket(self.tcp_socket)
+
+    def has_pending_data(self):
+        """
+        Verifica, sem bloquear, se há dados (ou fechamento) pendentes no socket.
+        Lança ConnectionError se o socket não puder ser verificado.
+        """
+        try:
+            readable, _, _ = select.select([self.tcp_socket], [], [], 0)
+        except (OSError, ValueError):
+            raise ConnectionError
+        return bool(readable)
+
+    def is_healthy(self):
+        """
+        Verifica se a conexão ociosa continua utilizável.
+        Mensagens de chat completas recebidas enquanto ociosa (broadcasts do servidor) são descartadas.
+        Fechamento pelo servidor, erro, dados que não são chat (ex.: SERVER_BUSY) ou chat incompleto
+        tornam a conexão inutilizável para um novo request.
+        """
+        pending = b""
+        try:
+            while True:
+                if not pending:
+                    if not self.has_pending_data():
+                        return True
+                    pending = self.receive_message(self.tcp_socket)
+                    if not isinstance(pending, bytes):  # Conexão fechada ou erro
+                        return False
+
+                status, content = Client.parse_response(pending)
+                if status != Commands.CHAT:
+                    return False
+
+                # Consome o restante da mensagem de chat apenas se já estiver disponível
+                message_len, message = content
+                while len(message) < message_len:
+                    if not self.has_pending_data():
+                        return False
+                    remaining = self.receive_message(self.tcp_socket, message_len - len(message))
+                    if not isinstance(remaining, bytes):
+                        return False
+                    message += remaining.decode('utf-8', errors='replace')
+
+                # Dados além da mensagem pertencem ao próximo frame
+                pending = message[message_len:].encode('utf-8')
+        except ConnectionError:
+            return False
+
+    def close(self):
+        """
+        Fecha o socket da conexão.
+        """
+        self.close_socket(self.tcp_socket, None)
+
+class ConnectionPool:
+    def __init__(self, IP, port, size=POOL_SIZE, max_retries=POOL_MAX_RETRIES, backoff=POOL_BACKOFF,
+                 max_backoff=POOL_MAX_BACKOFF, response_timeout=RESPONSE_TIMEOUT):
+        self.IP = IP
+        self.port = int(port)
+        self.size = size
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.response_timeout = response_timeout
+
+        # Conexões ociosas prontas para serem emprestadas
+        self.idle = []
+        # Número de conexões abertas (ociosas + emprestadas)
+        self.open_count = 0
+        # Trava o acesso ao pool e sinaliza conexões devolvidas
+        self.pool_cond = threading.Condition()
+        self.closed = False
+
+        # Contadores do pool (conexões criadas, reutilizadas, descartadas e tentativas repetidas)
+        self.stats = {"created": 0, "reused": 0, "discarded": 0, "retries": 0}
+
+    def acquire(self, timeout=None):
+        """
+        Empresta uma conexão do pool, reutilizando uma conexão ociosa saudável ou abrindo uma nova.
+        Bloqueia enquanto o pool estiver cheio. Retorna None se o timeout expirar.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self.pool_cond:
+            while True:
+                if self.closed:
+                    raise ConnectionError("Connection pool is closed.")
+
+                # Reutiliza uma conexão ociosa, descartando as que não estão mais saudáveis
+                while self.idle:
+                    conn = self.idle.pop()
+                    if conn.is_healthy():
+                        self.stats["reused"] += 1
+                        return conn
+                    self.open_count -= 1
+                    self.stats["discarded"] += 1
+                    conn.close()
+
+                # Reserva espaço para uma nova conexão
+                if self.open_count < self.size:
+                    self.open_count += 1
+                    break
+
+                # Pool cheio: aguarda a devolução de uma conexão
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return None
+                self.pool_cond.wait(remaining)
+
+        # Abre a conexão fora da trava para não bloquear as demais chamadas
+        try:
+            conn = PooledConnection(self.IP, self.port)
+        except Exception as e:
+            with self.pool_cond:
+                self.open_count -= 1
+                self.pool_cond.notify()
+            raise ConnectionError(f"Failed to connect to server at {self.IP}:{self.port}: {e}")
+
+        with self.pool_cond:
+            self.stats["created"] += 1
+        return conn
+
+    def release(self, conn, discard=False):
+        """
+        Devolve a conexão ao pool. Se discard for verdadeiro (ou o pool estiver fechado), fecha a conexão.
+        """
+        with self.pool_cond:
+            if discard or self.closed:
+                self.open_count -= 1
+                if discard:
+                    self.stats["discarded"] += 1
+                conn.close()
+            else:
+                self.idle.append(conn)
+            self.pool_cond.notify()
+
+    def fetch_file(self, filename):
+        """
+        Solicita um arquivo ao servidor usando uma conexão do pool.
+        Em caso de falha de transporte (ou servidor lotado), descarta a conexão e tenta novamente
+        com backoff exponencial. Retorna o status e os dados do arquivo (None em caso de erro).
+        Lança ConnectionError imediatamente se o pool estiver fechado.
+        """
+        delay = self.backoff
+        for attempt in range(self.max_retries + 1):
+            if attempt > 0:
+                with self.pool_cond:
+                    self.stats["retries"] += 1
+                time.sleep(delay)
+                delay = min(delay * 2, self.max_backoff)
+
+            try:
+                conn = self.acquire()
+            except ConnectionError as e:
+                if self.closed:     # Pool fechado: não há o que tentar novamente
+                    raise
+                status, content = None, e
+                continue
+
+            try:
+                conn.send_message(conn.tcp_socket, f"{Commands.GET_FILE} {filename}")
+                status, content = self.receive_file(conn)
+            except Exception as e:    # Falha de transporte: conexão não é mais confiável
+                self.release(conn, discard=True)
+                status, content = None, e
+                continue
+
+            if status == Status.SERVER_BUSY:    # Servidor fechará a conexão, tenta novamente depois
+                self.release(conn, discard=True)
+                continue
+
+            self.release(conn)
+            if status == Status.OK:
+                return status, content
+            return status, None
+
+        print(f"ERROR: Unable to fetch '{filename}' after {self.max_retries + 1} attempts: {status if status is not None else content}")
+        return status, None
+
+    def receive_chunk(self, conn, buffer_size=None):
+        """
+        Recebe dados pela conexão, aguardando no máximo response_timeout segundos sem dados.
+        Lança ConnectionError se a conexão cair ou o tempo esgotar.
+        """
+        deadline = time.monotonic() + self.response_timeout
+        while True:
+            if buffer_size is None:
+                data = conn.receive_message(conn.tcp_socket)
+            else:
+                data = conn.receive_message(conn.tcp_socket, buffer_size)
+            if data is None:
+                raise ConnectionError("Connection to server lost.")
+            if data != "TIMEOUT":
+                return data
+            if time.monotonic() > deadline:
+                raise ConnectionError("Timed out waiting for server response.")
+
+    def receive_file(self, conn):
+        """
+        Recebe a resposta de um GET_FILE, ignorando mensagens de chat recebidas no meio.
+        Retorna o status e os dados do arquivo (já com o hash verificado).
+        """
+        while True:
+            status, content = Client.parse_response(self.receive_chunk(conn))
+
+            if status == Commands.CHAT:
+                # Consome o restante da mensagem de chat antes de aguardar a resposta
+                message_len, message = content
+                while len(message) < message_len:
+                    message += self.receive_chunk(conn, message_len - len(message)).decode('utf-8', errors='replace')
+                continue
+
+            if status != Status.OK:
+                if status is None:  # Resposta ilegível: o fluxo da conexão está dessincronizado
+                    raise ConnectionError("Malformed response from server.")
+                return status, None
+
+            filename, file_size, hash_value, file_data = content
+            while file_size > len(file_data):
+                file_data += self.receive_chunk(conn, file_size - len(file_data))
+
+            if not verify_hash(file_data, hash_value):
+                raise ConnectionError("Hash verification failed. File may be corrupted.")
+            return status, file_data
+
+    def get_stats(self):
+        """
+        Retorna uma cópia dos contadores do pool, incluindo conexões abertas e ociosas.
+        """
+        with self.pool_cond:
+            stats = dict(self.stats)
+            stats["open"] = self.open_count
+            stats["idle"] = len(self.idle)
+        return stats
+
+    def close(self):
+        """
+        Fecha o pool e todas as conexões ociosas. Conexões emprestadas são fechadas ao serem devolvidas.
+        """
+        with self.pool_cond:
+            self.closed = True
+            idle, self.idle = self.idle, []
+            self.open_count -= len(idle)
+            self.pool_cond.notify_all()
+
+        for conn in idle:
+            try:
+                conn.send_message(conn.tcp_socket, Commands.EXIT)
+            except Exception:
+                pass
+            conn.close()
+
+if __name__ == "__main__":
+    import os
+    import sys
+    from macros import DIR_CLIENT
+
+    # Baixa os arquivos dados na linha de comando em paralelo, compartilhando o pool
+    filenames = sys.argv[1:] or ["beemovie.txt", "dracula.pdf", "utfpr.jpg"]
+    pool = ConnectionPool("localhost", 12345)
+
+    def worker(filename):
+        status, file_data = pool.fetch_file(filename)
+        if status == Status.OK:
+            if not os.path.exists(DIR_CLIENT):
+                os.makedirs(DIR_CLIENT)
+            with open(DIR_CLIENT + filename, 'wb') as file:
+                file.write(file_data)
+            print(f"File '{filename}' received successfully and saved to '{DIR_CLIENT}'.")
+        else:
+            print(f"ERROR: Unable to fetch '{filename}' (status: {status}).")
+
+    threads = [threading.Thread(target=worker, args=(f,)) for f in filenames]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    print(pool.get_stats())
+    pool.close()
@@ -5,17 +5,29 @@ Responde a requests de arquivos e mensagens de chat dos clientes.
 import socket
 from host import Host
 import threading
-from macros import MAX_BUFF_SIZE, DIR_SERVER, Commands, Status
+import time
+from macros import MAX_BUFF_SIZE, DIR_SERVER, Commands, Status, MAX_CLIENTS, LISTEN_BACKLOG, IDLE_TIMEOUT, TCP_KEEPALIVE, TCP_NODELAY
 from hash import calc_hash
 
+# Comando do console do servidor (prefixado para não conflitar com mensagens de chat)
+CONSOLE_STATS = "/stats"
+
 class Server(Host):
-    def __init__(self, IP, port):
+    def __init__(self, IP, port, max_clients=MAX_CLIENTS, backlog=LISTEN_BACKLOG, idle_timeout=IDLE_TIMEOUT,
+                 keepalive=TCP_KEEPALIVE, nodelay=TCP_NODELAY):
         super().__init__()
+        # Limites de admissão e opções das conexões
+        self.max_clients = max_clients
+        self.idle_timeout = idle_timeout
+        self.keepalive = keepalive
+        self.nodelay = nodelay
+
         # Inicia o servidor
         self.tcp_socket.bind((IP, port)) 
-        self.tcp_socket.listen()
-        print(f"Server listening on {IP}:{port}")
+        self.tcp_socket.listen(backlog)
+        print(f"Server listening on {IP}:{port} (max clients: {max_clients}, backlog: {backlog})")
         print("Type messages to broadcast to all clients or to a specific (IP:port).")
+        print(f"Type {CONSOLE_STATS} to show connection statistics.")
         print("Press Ctrl+C to stop the server.")
 
         # Mantém registro dos clientes conectados: mapeia socket -> endereço
@@ -24,6 +36,8 @@ class Server(Host):
         self.client_threads = {}
         # Trava o acesso à lista compartilhada de clientes conectados
         self.clients_lock = threading.Lock()
+        # Contadores de conexões (aceitas, rejeitadas por lotação e fechadas por inatividade)
+        self.stats = {"accepted": 0, "rejected": 0, "reaped": 0}
 
         # Evento de encerramento
         self.server_shutdown_event = threading.Event()
@@ -45,6 +59,9 @@ class Server(Host):
                 line = input()  # Lê entrada do console
                 if not line:
                     continue
+                if line.strip() == CONSOLE_STATS:
+                    self.print_stats()
+                    continue
                 try:
                     # Extrai endereço do remetente (opcional)
                     addr = line.split(' ', 1)[0].replace('(', '').replace(')', '')
@@ -93,11 +110,24 @@ class Server(Host):
             except (socket.timeout, OSError):
                 continue
 
-            print(f"Connection established with {client_address}")
+            # Timeout no socket do cliente (para verificar encerramento e inatividade)
+            client_socket.settimeout(1.0)
+            self.configure_socket(client_socket, self.keepalive, self.nodelay)
 
-            # Adiciona o cliente à lista de clientes conectados
+            # Rejeita a conexão se o limite de clientes foi atingido, senão adiciona o cliente à lista
             with self.clients_lock:
-                self.clients[client_socket] = client_address
+                admitted = len(self.clients) < self.max_clients
+                if admitted:
+                    self.clients[client_socket] = client_address
+                    self.stats["accepted"] += 1
+                else:
+                    self.stats["rejected"] += 1
+
+            if not admitted:
+                self.reject_client(client_socket, client_address)
+                continue
+
+            print(f"Connection established with {client_address}")
 
             # Inicia uma thread para tratar a comunicação com o cliente e armazena a thread
             client_thread = threading.Thread(target=self.handle_client, args=(client_socket, client_address), daemon=False)
@@ -110,6 +140,7 @@ class Server(Host):
         """
         Trata a comunicação com o cliente.
         """
+        last_activity = time.monotonic()    # Instante da última mensagem recebida do cliente
         while True:
             # Checa se o servidor será encerrado
             if self.server_shutdown_event.is_set():
@@ -119,14 +150,18 @@ class Server(Host):
             if msg is None:     # Cliente desconectou
                 break
             if msg == "TIMEOUT":
+                # Fecha conexões silenciosas por mais tempo que o limite de inatividade
+                if self.idle_expired(client_address, last_activity):
+                    break
                 continue
+            last_activity = time.monotonic()
 
             try:
                 command = msg.decode('utf-8').split(' ', 1)[0]  # Extrai comando da mensagem
 
             except (UnicodeDecodeError, IndexError):
                 try:
-                    self.send_message(client_socket, client_address, Status.BAD_REQUEST)
+                    self.send_message(client_socket, Status.BAD_REQUEST)
                 except ConnectionError:
                     break
                 print(f"ERROR: Unable to decode client message from {client_address}.")
@@ -144,7 +179,7 @@ class Server(Host):
 
                 except (UnicodeDecodeError, IndexError):
                     try:
-                        self.send_message(client_socket, client_address, Status.BAD_REQUEST)
+                        self.send_message(client_socket, Status.BAD_REQUEST)
                     except ConnectionError:
                         break
                     print(f"ERROR: Unable to parse filename from client request ({client_address}).")
@@ -155,28 +190,41 @@ class Server(Host):
             elif command == Commands.CHAT:  # Mensagem de chat
                 try:
                     # Parsing do request
-                    message_len = msg.decode('utf-8').split(' ', 2)[1]
+                    message_len = int(msg.decode('utf-8').split(' ', 2)[1])
                     message = msg.decode('utf-8').split(' ', 2)[2]
 
-                except (UnicodeDecodeError, IndexError):
+                except (UnicodeDecodeError, IndexError, ValueError):
                     try:
-                        self.send_message(client_socket, client_address, Status.BAD_REQUEST)
+                        self.send_message(client_socket, Status.BAD_REQUEST)
                     except ConnectionError:
                         break
                     print(f"ERROR: Unable to decode chat message from {client_address}.")
                     continue
 
+                # Limita o tamanho da mensagem para não aguardar um payload ilimitado
+                if message_len > MAX_BUFF_SIZE:
+                    try:
+                        self.send_message(client_socket, Status.BAD_REQUEST)
+                    except ConnectionError:
+                        break
+                    print(f"ERROR: Chat message from {client_address} too large ({message_len} > {MAX_BUFF_SIZE}).")
+                    continue
+
                 # Recebe o restante da mensagem, se necessário
                 try:
-                    while len(message) < int(message_len):
+                    while len(message) < message_len:
                         if self.server_shutdown_event.is_set():
                             raise Exception
                         
-                        remaining = self.receive_message(client_socket, client_address, int(message_len) - len(message))
+                        remaining = self.receive_message(client_socket, message_len - len(message))
                         if remaining is None:
                             raise Exception
                         if remaining == "TIMEOUT":
+                            # Cliente parou no meio da mensagem: mesma regra de inatividade
+                            if self.idle_expired(client_address, last_activity):
+                                raise Exception
                             continue
+                        last_activity = time.monotonic()
 
                         # Adiciona o restante da mensagem
                         message += remaining.decode('utf-8')
@@ -197,6 +245,45 @@ class Server(Host):
         # Fecha o socket do cliente ao sair do loop
         self.close_client(client_socket)
 
+    def idle_expired(self, client_address, last_activity):
+        """
+        Verifica se o cliente passou do limite de inatividade. Se sim, registra o fechamento e retorna True.
+        """
+        if self.idle_timeout is None or time.monotonic() - last_activity <= self.idle_timeout:
+            return False
+        print(f"Client {client_address} idle for more than {self.idle_timeout}s, closing connection.")
+        with self.clients_lock:
+            self.stats["reaped"] += 1
+        return True
+
+    def reject_client(self, client_socket, client_address):
+        """
+        Recusa uma conexão quando o servidor está lotado, avisando o cliente com o status SERVER_BUSY.
+        """
+        print(f"Server busy ({self.max_clients} clients), rejecting connection from {client_address}.")
+        try:
+            self.send_message(client_socket, Status.SERVER_BUSY)
+        except Exception:
+            pass
+        self.close_socket(client_socket, None)
+
+    def get_stats(self):
+        """
+        Retorna uma cópia dos contadores de conexões, incluindo o número de clientes ativos.
+        """
+        with self.clients_lock:
+            stats = dict(self.stats)
+            stats["active"] = len(self.clients)
+        return stats
+
+    def print_stats(self):
+        """
+        Mostra os contadores de conexões no console do servidor.
+        """
+        stats = self.get_stats()
+        print(f"[STATS] active: {stats['active']}/{self.max_clients}, accepted: {stats['accepted']}, "
+              f"rejected: {stats['rejected']}, reaped (idle): {stats['reaped']}")
+
     def load_file(self, filename):
         """
         Carrega o arquivo solicitado do sistema de arquivos.
@@ -269,14 +356,17 @@ class Server(Host):
         """
         Manda uma mensagem de chat para todos os clientes conectados. Opcionalmente envia para um cliente específico.
         """
+        # Copia a lista de clientes para não segurar a trava durante o envio (close_client também a usa)
         with self.clients_lock:
-            for sock in list(self.clients.keys()):
-                if specific_addr and self.clients[sock] != specific_addr:
-                    continue
-                try:
-                    self.send_message(sock, message)
-                except ConnectionError:
-                    self.close_client(sock)
+            clients = list(self.clients.items())
+
+        for sock, addr in clients:
+            if specific_addr and addr != specific_addr:
+                continue
+            try:
+                self.send_message(sock, message)
+            except ConnectionError:
+                self.close_client(sock)
 
     def close_client(self, client_socket):
         """
@@ -348,6 +438,7 @@ class Server(Host):
         except Exception:
             pass
 
+        self.print_stats()
         print("Server shutdown complete.")
 
 if __name__ == "__main__":